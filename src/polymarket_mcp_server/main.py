@@ -1,38 +1,82 @@
 #!/usr/bin/env python
+import atexit
+import logging
+import logging.handlers
+import queue
 import sys
-import os
-from dotenv import load_dotenv
-from polymarket_mcp_server.server import mcp, config
+from polymarket_mcp_server.server import mcp, config, dotenv_loaded
 
 def setup_environment():
-    # Load environment variables from .env file
-    try:
-        load_dotenv()
-        sys.stderr.write("Loaded environment variables from .env file\n")
-    except Exception as e:
-        sys.stderr.write(f"Note: .env file not loaded, using default environment variables: {str(e)}\n")
-    
-    sys.stderr.write("Using environment variables for configuration\n")
-    sys.stderr.write(f"Polymarket Gamma API configuration:\n")
-    sys.stderr.write(f"  API URL: {config.api_url}\n")
+    # The .env file is parsed once when the server module is imported
+    if dotenv_loaded:
+        status = "Loaded environment variables from .env file\n"
+    else:
+        status = "Note: .env file not loaded, using default environment variables\n"
     
     # Check if authentication is required and available (for future use)
     if config.requires_auth:
-        sys.stderr.write("\nWarning: Authentication required but not implemented for Gamma API.\n")
-        sys.stderr.write("Some API functions that require authentication may not work.\n")
+        auth_warning = (
+            "\nWarning: Authentication required but not implemented for Gamma API.\n"
+            "Some API functions that require authentication may not work.\n"
+        )
+    else:
+        auth_warning = ""
+    
+    # Emit the whole status block with a single write
+    sys.stderr.write(
+        f"{status}"
+        "Using environment variables for configuration\n"
+        "Polymarket Gamma API configuration:\n"
+        f"  API URL: {config.api_url}\n"
+        f"{auth_warning}"
+    )
     
     return True
 
+def setup_logging():
+    """Write the server's log records to stderr from a background thread"""
+    log_queue = queue.SimpleQueue()
+    stderr_handler = logging.StreamHandler(sys.stderr)
+    stderr_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stderr_handler)
+    
+    # Tool calls only enqueue records; the listener thread does the stderr I/O
+    logger = logging.getLogger("polymarket_mcp_server")
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.propagate = False
+    
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+def load_uvloop():
+    """Return the uvloop module when it is installed, else None"""
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop
+
 def run_server():
     """Main entry point for the Polymarket MCP Server"""
     if not setup_environment():
         sys.exit(1)
     
-    sys.stderr.write("\nStarting Polymarket MCP Server with Gamma API...\n")
-    sys.stderr.write("Running server in standard mode...\n")
+    setup_logging()
+    uvloop = load_uvloop()
+    loop_note = "Using uvloop event loop\n" if uvloop else ""
+    sys.stderr.write(
+        "\nStarting Polymarket MCP Server with Gamma API...\n"
+        "Running server in standard mode...\n"
+        f"{loop_note}"
+    )
     
-    # Run the server with the stdio transport
-    mcp.run(transport="stdio")
+    # Run the server with the stdio transport. uvloop.run creates its loop
+    # through a loop factory rather than the deprecated event loop policy API
+    if uvloop is not None:
+        uvloop.run(mcp.run_stdio_async())
+    else:
+        mcp.run(transport="stdio")
 
 if __name__ == "__main__":
     run_server()
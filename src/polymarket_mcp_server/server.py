@@ -1,53 +1,341 @@
 #!/usr/bin/env python
 
 import os
-import json
-import sys
-from typing import Any, Dict, List, Optional, Union
+import asyncio
+import logging
+import time
+import random
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 import httpx
+import orjson
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
 
-# Load environment variables from .env file (silently continues if no file found)
+logger = logging.getLogger(__name__)
+
+# Load environment variables from .env file (silently continues if no file found).
+# This is the only place the file is parsed; main.py reports on the result.
 try:
-    load_dotenv()
+    dotenv_loaded = load_dotenv()
 except Exception:
-    pass
-
-mcp = FastMCP("Polymarket MCP")
+    dotenv_loaded = False
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class GammaConfig:
     api_url: str = "https://gamma-api.polymarket.com"
     requires_auth: bool = False
+    cache_ttl: float = 300.0
+    rate_limit: float = 50.0
+    max_concurrency: int = 16
+
+def _env_number(name: str, default: Union[int, float], parse: Callable[[str], Union[int, float]]) -> Union[int, float]:
+    """Parse a numeric environment variable, falling back to the default if it is unset or malformed."""
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        return parse(value)
+    except ValueError:
+        logger.warning("Ignoring invalid %s=%r, using default %s", name, value, default)
+        return default
+
+def load_config() -> GammaConfig:
+    """Load configuration from environment variables with defaults."""
+    env = os.environ
+    return GammaConfig(
+        api_url=env.get("GAMMA_API_URL", "https://gamma-api.polymarket.com"),
+        requires_auth=env.get("GAMMA_REQUIRES_AUTH", "false").lower() == "true",
+        cache_ttl=_env_number("GAMMA_CACHE_TTL", 300.0, float),
+        rate_limit=_env_number("GAMMA_RATE_LIMIT", 50.0, float),
+        max_concurrency=max(1, _env_number("GAMMA_MAX_CONCURRENCY", 16, int))
+    )
+
+# Load configuration once at import; the config is frozen so the rest of the
+# module can rely on it never changing at runtime
+config = load_config()
+
+# Shared HTTP client, created lazily so connections (and their TLS sessions) are
+# pooled across tool calls instead of being re-established on every request.
+# HTTP/2 lets concurrent tool calls multiplex over a single connection, and
+# httpx advertises gzip/brotli so large JSON listings come back compressed.
+_client: Optional[httpx.AsyncClient] = None
+_MAX_KEEPALIVE_CONNECTIONS = config.max_concurrency
+_MAX_CONNECTIONS = 2 * config.max_concurrency
+
+# Caps in-flight requests at what the pool keeps alive, so bursts reuse warm
+# connections instead of opening and discarding extra ones
+_request_slots = asyncio.Semaphore(config.max_concurrency)
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        # The transport owns pooling; its retries re-attempt failed connection
+        # setup (e.g. a dropped idle connection) before any request is sent
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=2,
+            limits=httpx.Limits(
+                max_connections=_MAX_CONNECTIONS,
+                max_keepalive_connections=_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=75.0
+            ),
+        )
+        _client = httpx.AsyncClient(
+            base_url=config.api_url,
+            transport=transport,
+            headers={"Content-Type": "application/json", "Accept": "application/json"},
+            timeout=httpx.Timeout(30.0, connect=10.0),
+        )
+    return _client
+
+async def close_client() -> None:
+    """Close the shared HTTP client if it has been created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Server lifespan that sets up the shared client and releases it on shutdown."""
+    # Build the client (and its SSL context) up front so the first tool call
+    # doesn't pay for it
+    _get_client()
+    try:
+        yield
+    finally:
+        await close_client()
+
+mcp = FastMCP("Polymarket MCP", lifespan=lifespan)
+
+class _RateLimiter:
+    """Token bucket that limits how many API requests start per second."""
+    
+    def __init__(self, rate: float):
+        self.rate = rate
+        # The bucket must hold at least one whole token, or rates below 1/s never admit a request
+        self._capacity = max(1.0, rate)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+    
+    async def acquire(self) -> None:
+        """Wait until a request may be sent; a rate of 0 or less disables limiting."""
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+_rate_limiter = _RateLimiter(config.rate_limit)
+
+# Responses worth retrying: rate limiting and transient gateway errors
+_RETRY_STATUS_CODES = frozenset((429, 502, 503, 504))
+# Dropped connections worth retrying. Connect failures are left to the
+# transport's own retries, and read timeouts are not retried, as the request
+# may simply be slow and would block the tool call for several timeouts
+_RETRY_EXCEPTIONS = (httpx.ReadError, httpx.WriteError, httpx.RemoteProtocolError)
+_MAX_ATTEMPTS = 5
+_MAX_RETRY_DELAY = 30.0
+_MAX_CONNECTION_RETRY_DELAY = 2.0
+
+def _retry_delay(response: Optional[httpx.Response], attempt: int) -> float:
+    """Seconds to wait before retrying, honoring a numeric Retry-After header."""
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), _MAX_RETRY_DELAY)
+        except ValueError:
+            pass
+    # Exponential backoff with jitter
+    return min(2 ** attempt + random.random(), _MAX_RETRY_DELAY)
 
-# Load configuration from environment variables with defaults
-config = GammaConfig(
-    api_url=os.environ.get("GAMMA_API_URL", "https://gamma-api.polymarket.com"),
-    requires_auth=os.environ.get("GAMMA_REQUIRES_AUTH", "false").lower() == "true"
-)
+def _connection_retry_delay(attempt: int) -> float:
+    """Seconds to wait before resending after a dropped connection."""
+    # Short jittered backoff: 0.2-0.4s, doubling up to 2s
+    return min(0.2 * 2 ** attempt * (1 + random.random()), _MAX_CONNECTION_RETRY_DELAY)
+
+# In-process cache for idempotent GET responses, keyed on (endpoint, params)
+# and storing (expiry time, response)
+_CACHE_MAX_ENTRIES = 512
+_response_cache: Dict[Tuple[str, Tuple[Any, ...]], Tuple[float, Any]] = {}
+
+# Last ETag and decoded body seen for each GET, used to revalidate with
+# If-None-Match so unchanged payloads are not downloaded and decoded again
+_etag_cache: Dict[Tuple[str, Tuple[Any, ...]], Tuple[str, Any]] = {}
+
+def _cache_key(endpoint: str, params: Optional[Dict[str, Any]]) -> Tuple[str, Tuple[Any, ...]]:
+    """Build a hashable cache key from an endpoint and its query parameters."""
+    if not params:
+        return (endpoint, ())
+    return (endpoint, tuple(sorted(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in params.items()
+    )))
+
+def clear_cache() -> None:
+    """Drop all cached API responses."""
+    _response_cache.clear()
+    _etag_cache.clear()
 
 async def make_api_request(endpoint: str, params: Dict[str, Any] = None, method: str = "GET", data: Dict[str, Any] = None) -> Dict[str, Any]:
     """Make a request to the Polymarket Gamma API."""
-    url = f"{config.api_url.rstrip('/')}/{endpoint.lstrip('/')}"
-    headers = {"Content-Type": "application/json"}
+    if method not in ("GET", "POST"):
+        raise ValueError(f"Unsupported HTTP method: {method}")
     
     # Add authentication if needed in the future
     if config.requires_auth:
         # Implementation would depend on Gamma API auth requirements
         pass
     
-    async with httpx.AsyncClient() as client:
-        if method == "GET":
-            response = await client.get(url, headers=headers, params=params or {})
-        elif method == "POST":
-            response = await client.post(url, headers=headers, json=data, params=params or {})
+    is_get = method == "GET"
+    if is_get:
+        key = _cache_key(endpoint, params)
+        validator = _etag_cache.get(key)
+        headers = {"If-None-Match": validator[0]} if validator else None
+        content = None
+        # GETs are idempotent, so rate limiting and transient errors are retried
+        attempts = _MAX_ATTEMPTS
+    else:
+        validator = headers = None
+        content = orjson.dumps(data) if data is not None else None
+        attempts = 1
+    
+    # The client's base_url resolves the endpoint, with or without a leading slash
+    client = _get_client()
+    for attempt in range(attempts):
+        await _rate_limiter.acquire()
+        try:
+            async with _request_slots:
+                response = await client.request(method, endpoint, params=params, headers=headers, content=content)
+        except _RETRY_EXCEPTIONS:
+            if attempt == attempts - 1:
+                raise
+            await asyncio.sleep(_connection_retry_delay(attempt))
+            continue
+        if response.status_code not in _RETRY_STATUS_CODES or attempt == attempts - 1:
+            break
+        await asyncio.sleep(_retry_delay(response, attempt))
+    
+    if validator and response.status_code == 304:
+        return validator[1]
+    
+    response.raise_for_status()
+    result = orjson.loads(response.content)
+    
+    if is_get:
+        etag = response.headers.get("ETag")
+        if etag:
+            if key not in _etag_cache and len(_etag_cache) >= _CACHE_MAX_ENTRIES:
+                del _etag_cache[next(iter(_etag_cache))]
+            _etag_cache[key] = (etag, result)
+    return result
+
+# Requests currently being fetched for the response cache, so concurrent
+# callers asking for the same data share a single API call
+_inflight_requests: Dict[Tuple[str, Tuple[Any, ...]], "asyncio.Future[Any]"] = {}
+
+async def cached_api_request(endpoint: str, params: Optional[Dict[str, Any]] = None, ttl: float = 30.0) -> Dict[str, Any]:
+    """
+    Make a GET request to the Gamma API, reusing a cached response for up to ttl seconds.
+    
+    The ttl is capped by config.cache_ttl (GAMMA_CACHE_TTL); a cap of 0 disables caching.
+    Only use this for read-only endpoints whose data may be slightly stale.
+    """
+    ttl = min(ttl, config.cache_ttl)
+    if ttl <= 0:
+        return await make_api_request(endpoint, params=params)
+    
+    key = _cache_key(endpoint, params)
+    now = time.monotonic()
+    cached = _response_cache.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    
+    pending = _inflight_requests.get(key)
+    if pending is not None:
+        # Shield so a cancelled caller doesn't cancel the fetch for the others
+        return await asyncio.shield(pending)
+    
+    pending = asyncio.ensure_future(make_api_request(endpoint, params=params))
+    _inflight_requests[key] = pending
+    try:
+        response = await asyncio.shield(pending)
+    finally:
+        if _inflight_requests.get(key) is pending:
+            del _inflight_requests[key]
+    
+    if len(_response_cache) >= _CACHE_MAX_ENTRIES:
+        # Evict expired entries first, then the oldest ones if still full
+        for stale_key in [k for k, (expiry, _) in _response_cache.items() if expiry <= now]:
+            del _response_cache[stale_key]
+        while len(_response_cache) >= _CACHE_MAX_ENTRIES:
+            del _response_cache[next(iter(_response_cache))]
+    _response_cache[key] = (now + ttl, response)
+    return response
+
+# Free-text arguments where an empty string means "not set"; other empty
+# strings (e.g. slug="") are forwarded to the API as given
+_BLANK_AS_UNSET = frozenset(("order", "start_date_min", "start_date_max", "end_date_min", "end_date_max"))
+
+def _build_params(values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build API query parameters from tool arguments, skipping unset ones.
+    
+    None and empty lists are treated as unset, as are empty strings for the
+    arguments in _BLANK_AS_UNSET. List values are passed as lists, which httpx
+    sends as repeated query parameters (id=1&id=2).
+    """
+    return {
+        name: list(value) if isinstance(value, list) else value
+        for name, value in values.items()
+        if value is not None and value != [] and not (value == "" and name in _BLANK_AS_UNSET)
+    }
+
+# Failures the tools report as empty or error results; anything else is a bug and propagates
+_API_ERRORS = (httpx.HTTPError, ValueError, KeyError)
+
+# Upper bound on the API calls a single bulk tool call keeps in flight
+_BULK_CONCURRENCY = 20
+
+async def _fetch_many(
+    kind: str,
+    item_ids: List[str],
+    fetch: Callable[[str], Awaitable[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """
+    Fetch several items concurrently, preserving the order of item_ids.
+    
+    Items that cannot be fetched are returned as {"id": ..., "error": ...} entries.
+    """
+    semaphore = asyncio.Semaphore(_BULK_CONCURRENCY)
+    
+    async def fetch_one(item_id: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await fetch(item_id)
+    
+    results = await asyncio.gather(*(fetch_one(item_id) for item_id in item_ids), return_exceptions=True)
+    
+    items = []
+    for item_id, result in zip(item_ids, results):
+        if isinstance(result, _API_ERRORS):
+            logger.error("Error getting %s details for %s: %s", kind, item_id, result)
+            items.append({"id": item_id, "error": str(result)})
+        elif isinstance(result, BaseException):
+            raise result
         else:
-            raise ValueError(f"Unsupported HTTP method: {method}")
-        
-        response.raise_for_status()
-        return response.json()
+            items.append(result)
+    return items
+
+# Legacy get_markets status values and the boolean filter each one enables
+_LEGACY_STATUS_FILTERS = {"open": "active", "closed": "closed", "archived": "archived"}
 
 @mcp.tool(description="Get a list of all available markets on Polymarket with comprehensive filtering options.")
 async def get_markets(
@@ -102,85 +390,41 @@ async def get_markets(
     - status: (Deprecated) Filter by status string (open, closed, archived)
     """
     try:
-        params = {}
+        params = _build_params({
+            "limit": limit,
+            "offset": offset,
+            "order": order,
+            "ascending": ascending,
+            "id": id,
+            "slug": slug,
+            "archived": archived,
+            "active": active,
+            "closed": closed,
+            "clob_token_ids": clob_token_ids,
+            "condition_ids": condition_ids,
+            "liquidity_num_min": liquidity_num_min,
+            "liquidity_num_max": liquidity_num_max,
+            "volume_num_min": volume_num_min,
+            "volume_num_max": volume_num_max,
+            "start_date_min": start_date_min,
+            "start_date_max": start_date_max,
+            "end_date_min": end_date_min,
+            "end_date_max": end_date_max,
+            "tag_id": tag_id,
+            # related_tags is only meaningful together with tag_id
+            "related_tags": related_tags if tag_id is not None else None,
+        })
         
         # Handle the legacy status parameter for backward compatibility
         if status:
-            if status.lower() == "open":
-                active = True
-            elif status.lower() == "closed":
-                closed = True
-            elif status.lower() == "archived":
-                archived = True
+            status_filter = _LEGACY_STATUS_FILTERS.get(status.lower())
+            if status_filter:
+                params[status_filter] = True
         
-        # Add all parameters to the request
-        if limit is not None:
-            params["limit"] = limit
-        if offset is not None:
-            params["offset"] = offset
-        if order:
-            params["order"] = order
-        if ascending is not None:
-            params["ascending"] = ascending
-        if id is not None:
-            # Handle both single value and list
-            if isinstance(id, list):
-                for single_id in id:
-                    params.setdefault("id", []).append(single_id)
-            else:
-                params["id"] = id
-        if slug is not None:
-            # Handle both single value and list
-            if isinstance(slug, list):
-                for single_slug in slug:
-                    params.setdefault("slug", []).append(single_slug)
-            else:
-                params["slug"] = slug
-        if archived is not None:
-            params["archived"] = archived
-        if active is not None:
-            params["active"] = active
-        if closed is not None:
-            params["closed"] = closed
-        if clob_token_ids is not None:
-            # Handle both single value and list
-            if isinstance(clob_token_ids, list):
-                for token_id in clob_token_ids:
-                    params.setdefault("clob_token_ids", []).append(token_id)
-            else:
-                params["clob_token_ids"] = clob_token_ids
-        if condition_ids is not None:
-            # Handle both single value and list
-            if isinstance(condition_ids, list):
-                for condition_id in condition_ids:
-                    params.setdefault("condition_ids", []).append(condition_id)
-            else:
-                params["condition_ids"] = condition_ids
-        if liquidity_num_min is not None:
-            params["liquidity_num_min"] = liquidity_num_min
-        if liquidity_num_max is not None:
-            params["liquidity_num_max"] = liquidity_num_max
-        if volume_num_min is not None:
-            params["volume_num_min"] = volume_num_min
-        if volume_num_max is not None:
-            params["volume_num_max"] = volume_num_max
-        if start_date_min:
-            params["start_date_min"] = start_date_min
-        if start_date_max:
-            params["start_date_max"] = start_date_max
-        if end_date_min:
-            params["end_date_min"] = end_date_min
-        if end_date_max:
-            params["end_date_max"] = end_date_max
-        if tag_id is not None:
-            params["tag_id"] = tag_id
-        if related_tags is not None and tag_id is not None:
-            params["related_tags"] = related_tags
-        
-        response = await make_api_request("markets", params=params)
+        response = await cached_api_request("markets", params=params, ttl=30)
         return response
-    except Exception as e:
-        sys.stderr.write(f"Error getting markets: {str(e)}\n")
+    except _API_ERRORS as e:
+        logger.error("Error getting markets: %s", e)
         return {"markets": []}
 
 @mcp.tool(description="Get detailed information about a specific market by its ID.")
@@ -192,11 +436,26 @@ async def get_market_by_id(market_id: str) -> Dict[str, Any]:
     - market_id: The unique identifier of the market
     """
     try:
-        return await make_api_request(f"markets/{market_id}")
-    except Exception as e:
-        sys.stderr.write(f"Error getting market details: {str(e)}\n")
+        return await cached_api_request(f"markets/{market_id}", ttl=15)
+    except _API_ERRORS as e:
+        logger.error("Error getting market details: %s", e)
         return {"error": str(e)}
 
+@mcp.tool(description="Get detailed information about multiple markets by their IDs in a single call.")
+async def get_markets_bulk(market_ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Get detailed information about several markets, fetched concurrently.
+    
+    Parameters:
+    - market_ids: The unique identifiers of the markets
+    
+    Note: Markets that cannot be fetched are returned as {"id": ..., "error": ...}
+    entries so that one bad ID does not fail the whole batch.
+    """
+    return await _fetch_many(
+        "market", market_ids, lambda market_id: cached_api_request(f"markets/{market_id}", ttl=15)
+    )
+
 @mcp.tool(description="[EXPERIMENTAL] Get the current order book for a specific market.")
 async def get_order_book(market_id: str, outcome_id: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -210,13 +469,10 @@ async def get_order_book(market_id: str, outcome_id: Optional[str] = None) -> Di
     - outcome_id: Optional outcome ID to filter by
     """
     try:
-        params = {}
-        if outcome_id:
-            params["outcome_id"] = outcome_id
-            
+        params = {"outcome_id": outcome_id} if outcome_id else None
         return await make_api_request(f"markets/{market_id}/orderbook", params=params)
-    except Exception as e:
-        sys.stderr.write(f"Error getting order book: {str(e)}\n")
+    except _API_ERRORS as e:
+        logger.error("Error getting order book: %s", e)
         return {"error": str(e)}
 
 @mcp.tool(description="[EXPERIMENTAL] Get the latest trades for a specific market.")
@@ -234,8 +490,8 @@ async def get_recent_trades(market_id: str, limit: int = 50) -> Dict[str, Any]:
     try:
         params = {"limit": limit}
         return await make_api_request(f"markets/{market_id}/trades", params=params)
-    except Exception as e:
-        sys.stderr.write(f"Error getting recent trades: {str(e)}\n")
+    except _API_ERRORS as e:
+        logger.error("Error getting recent trades: %s", e)
         return {"trades": []}
 
 @mcp.tool(description="[EXPERIMENTAL] Get historical market data for a specific market.")
@@ -252,9 +508,12 @@ async def get_market_history(market_id: str, resolution: str = "hour") -> Dict[s
     """
     try:
         params = {"resolution": resolution}
+        # Coarse bars change slowly enough to cache; hourly data is always fetched
+        if resolution in ("day", "week"):
+            return await cached_api_request(f"markets/{market_id}/history", params=params, ttl=300)
         return await make_api_request(f"markets/{market_id}/history", params=params)
-    except Exception as e:
-        sys.stderr.write(f"Error getting market history: {str(e)}\n")
+    except _API_ERRORS as e:
+        logger.error("Error getting market history: %s", e)
         return {"history": []}
 
 @mcp.tool(description="Search for markets by keyword or phrase using slug filtering.")
@@ -272,18 +531,22 @@ async def search_markets(query: str, limit: int = 20) -> Dict[str, Any]:
     try:
         # Using the slug parameter for search
         params = {"slug": query, "limit": limit}
-        return await make_api_request("markets", params=params)
-    except Exception as e:
-        sys.stderr.write(f"Error searching markets: {str(e)}\n")
+        return await cached_api_request("markets", params=params, ttl=60)
+    except _API_ERRORS as e:
+        logger.error("Error searching markets: %s", e)
         return {"markets": []}
 
+def _to_pretty_json(obj: Any) -> str:
+    """Serialize an API payload as indented JSON text for resources."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
 @mcp.resource("polymarket://markets")
 async def markets_resource() -> str:
     """Resource that returns all available markets."""
     try:
         markets = await get_markets()
-        return json.dumps(markets, indent=2)
-    except Exception as e:
+        return _to_pretty_json(markets)
+    except orjson.JSONEncodeError as e:
         return f"Error retrieving markets: {str(e)}"
 
 @mcp.resource("polymarket://markets/{market_id}")
@@ -296,8 +559,8 @@ async def market_details_resource(market_id: str) -> str:
     """
     try:
         market = await get_market_by_id(market_id=market_id)
-        return json.dumps(market, indent=2)
-    except Exception as e:
+        return _to_pretty_json(market)
+    except orjson.JSONEncodeError as e:
         return f"Error retrieving market details: {str(e)}"
 
 @mcp.resource("polymarket://search/{query}")
@@ -310,8 +573,8 @@ async def search_markets_resource(query: str) -> str:
     """
     try:
         markets = await search_markets(query=query)
-        return json.dumps(markets, indent=2)
-    except Exception as e:
+        return _to_pretty_json(markets)
+    except orjson.JSONEncodeError as e:
         return f"Error searching markets: {str(e)}"
 
 @mcp.tool(description="Get a list of all available events on Polymarket with comprehensive filtering options.")
@@ -368,53 +631,25 @@ async def get_events(
     tag > tag_id > tag_slug.
     """
     try:
-        params = {}
-        
-        # Add all parameters to the request
-        if limit is not None:
-            params["limit"] = limit
-        if offset is not None:
-            params["offset"] = offset
-        if order:
-            params["order"] = order
-        if ascending is not None:
-            params["ascending"] = ascending
-        if id is not None:
-            # Handle both single value and list
-            if isinstance(id, list):
-                for single_id in id:
-                    params.setdefault("id", []).append(single_id)
-            else:
-                params["id"] = id
-        if slug is not None:
-            # Handle both single value and list
-            if isinstance(slug, list):
-                for single_slug in slug:
-                    params.setdefault("slug", []).append(single_slug)
-            else:
-                params["slug"] = slug
-        if archived is not None:
-            params["archived"] = archived
-        if active is not None:
-            params["active"] = active
-        if closed is not None:
-            params["closed"] = closed
-        if liquidity_min is not None:
-            params["liquidity_min"] = liquidity_min
-        if liquidity_max is not None:
-            params["liquidity_max"] = liquidity_max
-        if volume_min is not None:
-            params["volume_min"] = volume_min
-        if volume_max is not None:
-            params["volume_max"] = volume_max
-        if start_date_min:
-            params["start_date_min"] = start_date_min
-        if start_date_max:
-            params["start_date_max"] = start_date_max
-        if end_date_min:
-            params["end_date_min"] = end_date_min
-        if end_date_max:
-            params["end_date_max"] = end_date_max
+        params = _build_params({
+            "limit": limit,
+            "offset": offset,
+            "order": order,
+            "ascending": ascending,
+            "id": id,
+            "slug": slug,
+            "archived": archived,
+            "active": active,
+            "closed": closed,
+            "liquidity_min": liquidity_min,
+            "liquidity_max": liquidity_max,
+            "volume_min": volume_min,
+            "volume_max": volume_max,
+            "start_date_min": start_date_min,
+            "start_date_max": start_date_max,
+            "end_date_min": end_date_min,
+            "end_date_max": end_date_max,
+        })
         
         # Handle tag filter priority: tag > tag_id > tag_slug
         if tag:
@@ -426,9 +661,9 @@ async def get_events(
         elif tag_slug:
             params["tag_slug"] = tag_slug
             
-        return await make_api_request("events", params=params)
-    except Exception as e:
-        sys.stderr.write(f"Error getting events: {str(e)}\n")
+        return await cached_api_request("events", params=params, ttl=30)
+    except _API_ERRORS as e:
+        logger.error("Error getting events: %s", e)
         return {"events": []}
 
 @mcp.tool(description="Get detailed information about a specific event by its ID.")
@@ -440,18 +675,44 @@ async def get_event_by_id(event_id: str) -> Dict[str, Any]:
     - event_id: The unique identifier of the event
     """
     try:
-        return await make_api_request(f"events/{event_id}")
-    except Exception as e:
-        sys.stderr.write(f"Error getting event details: {str(e)}\n")
+        return await cached_api_request(f"events/{event_id}", ttl=15)
+    except _API_ERRORS as e:
+        logger.error("Error getting event details: %s", e)
         return {"error": str(e)}
 
+@mcp.tool(description="Get detailed information about multiple events by their IDs in a single call.")
+async def get_events_bulk(event_ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Get detailed information about several events, fetched concurrently.
+    
+    Parameters:
+    - event_ids: The unique identifiers of the events
+    
+    Note: Events that cannot be fetched are returned as {"id": ..., "error": ...}
+    entries so that one bad ID does not fail the whole batch.
+    """
+    return await _fetch_many(
+        "event", event_ids, lambda event_id: cached_api_request(f"events/{event_id}", ttl=15)
+    )
+
+@mcp.tool(description="Clear cached market and event data so the next requests fetch fresh data from Polymarket.")
+async def clear_response_cache() -> Dict[str, Any]:
+    """
+    Clear all cached API responses.
+    
+    Market and event data is cached for a short time; use this when the latest
+    values are needed immediately.
+    """
+    clear_cache()
+    return {"cleared": True}
+
 @mcp.resource("polymarket://events")
 async def events_resource() -> str:
     """Resource that returns all available events."""
     try:
         events = await get_events()
-        return json.dumps(events, indent=2)
-    except Exception as e:
+        return _to_pretty_json(events)
+    except orjson.JSONEncodeError as e:
         return f"Error retrieving events: {str(e)}"
 
 @mcp.resource("polymarket://events/{event_id}")
@@ -464,10 +725,6 @@ async def event_details_resource(event_id: str) -> str:
     """
     try:
         event = await get_event_by_id(event_id=event_id)
-        return json.dumps(event, indent=2)
-    except Exception as e:
+        return _to_pretty_json(event)
+    except orjson.JSONEncodeError as e:
         return f"Error retrieving event details: {str(e)}"
-
-if __name__ == "__main__":
-    sys.stderr.write(f"Starting Polymarket MCP Server with Gamma API...\n")
-    mcp.run()
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from polymarket_mcp_server import main, server
+from polymarket_mcp_server.server import GammaConfig, _RateLimiter, clear_cache
+
+
+@pytest.fixture(autouse=True)
+def _clear_response_cache():
+    """Make sure no cached API response leaks from one test into another."""
+    clear_cache()
+    yield
+    clear_cache()
+
+
+@pytest.fixture(scope="session")
+def _baseline_config():
+    """The default configuration, independent of the environment and any .env file."""
+    return GammaConfig()
+
+
+@pytest.fixture(autouse=True)
+def _restore_config(monkeypatch, _baseline_config):
+    """Start every test from the default config and the module state sized from it."""
+    monkeypatch.setattr(server, "config", _baseline_config)
+    monkeypatch.setattr(main, "config", _baseline_config)
+    monkeypatch.setattr(server, "_MAX_KEEPALIVE_CONNECTIONS", _baseline_config.max_concurrency)
+    monkeypatch.setattr(server, "_MAX_CONNECTIONS", 2 * _baseline_config.max_concurrency)
+    monkeypatch.setattr(server, "_request_slots", asyncio.Semaphore(_baseline_config.max_concurrency))
+
+
+@pytest.fixture(autouse=True)
+def _unlimited_rate(monkeypatch):
+    """Don't throttle mocked requests; tests of the limiter build their own."""
+    monkeypatch.setattr(server, "_rate_limiter", _RateLimiter(0))
+
+
+def pytest_asyncio_loop_factories(config, item):
+    """Run the async tests on uvloop when it is installed, like the server does."""
+    try:
+        import uvloop
+    except ImportError:
+        return {"asyncio": asyncio.new_event_loop}
+    return {"uvloop": uvloop.new_event_loop}
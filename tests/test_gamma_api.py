@@ -1,21 +1,40 @@
 import pytest
 import asyncio
-from unittest.mock import AsyncMock, patch
+import httpx
+from unittest.mock import call, patch
 import json
 from polymarket_mcp_server.server import (
+    GammaConfig,
     get_markets,
     get_market_by_id,
     get_events,
     get_event_by_id,
     search_markets,
+    get_market_history,
+    get_markets_bulk,
+    get_events_bulk,
+    clear_response_cache,
+    market_details_resource,
 )
 
-@pytest.fixture
-def mock_make_api_request():
+# Every test in this module mocks the API, so the patch is applied once per module
+@pytest.fixture(scope="module")
+def _patched_make_api_request():
     with patch('polymarket_mcp_server.server.make_api_request') as mock:
         yield mock
 
-@pytest.mark.asyncio
+@pytest.fixture
+def cache_enabled():
+    # Pin the TTL cap so caching tests don't depend on GAMMA_CACHE_TTL in the environment
+    with patch('polymarket_mcp_server.server.config', GammaConfig(cache_ttl=300)):
+        yield
+
+@pytest.fixture
+def mock_make_api_request(_patched_make_api_request):
+    # Start each test with no recorded calls, return value or side effect
+    _patched_make_api_request.reset_mock(return_value=True, side_effect=True)
+    yield _patched_make_api_request
+
 async def test_get_markets(mock_make_api_request):
     # Sample market data for testing
     sample_markets = {
@@ -39,14 +58,13 @@ async def test_get_markets(mock_make_api_request):
     result = await get_markets()
     
     # Verify the API was called correctly
-    mock_make_api_request.assert_called_once_with("markets", params={})
+    assert mock_make_api_request.call_args_list == [call("markets", params={})]
     
     # Verify the result is as expected
     assert result == sample_markets
     assert len(result["markets"]) == 1
     assert result["markets"][0]["id"] == 123
 
-@pytest.mark.asyncio
 async def test_get_markets_with_status(mock_make_api_request):
     # Sample market data for testing
     sample_markets = {
@@ -68,12 +86,11 @@ async def test_get_markets_with_status(mock_make_api_request):
     result = await get_markets(status="open")
     
     # Verify the API was called with the correct parameters
-    mock_make_api_request.assert_called_once_with("markets", params={"active": True})
+    assert mock_make_api_request.call_args_list == [call("markets", params={"active": True})]
     
     # Verify the result is as expected
     assert result == sample_markets
 
-@pytest.mark.asyncio
 async def test_get_market_by_id(mock_make_api_request):
     # Sample market data for testing
     sample_market = {
@@ -93,13 +110,12 @@ async def test_get_market_by_id(mock_make_api_request):
     result = await get_market_by_id("123")
     
     # Verify the API was called correctly
-    mock_make_api_request.assert_called_once_with("markets/123")
+    assert mock_make_api_request.call_args_list == [call("markets/123", params=None)]
     
     # Verify the result is as expected
     assert result == sample_market
     assert result["id"] == 123
 
-@pytest.mark.asyncio
 async def test_get_events(mock_make_api_request):
     # Sample event data for testing
     sample_events = {
@@ -124,14 +140,13 @@ async def test_get_events(mock_make_api_request):
     result = await get_events(limit=10, active=True)
     
     # Verify the API was called correctly
-    mock_make_api_request.assert_called_once_with("events", params={"limit": 10, "active": True})
+    assert mock_make_api_request.call_args_list == [call("events", params={"limit": 10, "active": True})]
     
     # Verify the result is as expected
     assert result == sample_events
     assert len(result["events"]) == 1
     assert result["events"][0]["id"] == 456
 
-@pytest.mark.asyncio
 async def test_search_markets(mock_make_api_request):
     # Sample market data for testing
     sample_markets = {
@@ -155,14 +170,13 @@ async def test_search_markets(mock_make_api_request):
     result = await search_markets("bitcoin", limit=10)
     
     # Verify the API was called correctly
-    mock_make_api_request.assert_called_once_with("markets", params={"slug": "bitcoin", "limit": 10})
+    assert mock_make_api_request.call_args_list == [call("markets", params={"slug": "bitcoin", "limit": 10})]
     
     # Verify the result is as expected
     assert result == sample_markets
     assert len(result["markets"]) == 1
     assert result["markets"][0]["slug"] == "btc-price"
 
-@pytest.mark.asyncio
 async def test_get_event_by_id(mock_make_api_request):
     # Sample event data for testing
     sample_event = {
@@ -183,19 +197,194 @@ async def test_get_event_by_id(mock_make_api_request):
     result = await get_event_by_id("456")
     
     # Verify the API was called correctly
-    mock_make_api_request.assert_called_once_with("events/456")
+    assert mock_make_api_request.call_args_list == [call("events/456", params=None)]
     
     # Verify the result is as expected
     assert result == sample_event
     assert result["id"] == 456
 
-@pytest.mark.asyncio
 async def test_api_error_handling(mock_make_api_request):
     # Simulate an API error
-    mock_make_api_request.side_effect = Exception("API error")
+    mock_make_api_request.side_effect = httpx.HTTPError("API error")
     
     # Call the function and verify error handling
     result = await get_markets()
     
     # Verify the result contains an empty markets list
     assert result == {"markets": []}
+
+async def test_programming_errors_propagate(mock_make_api_request):
+    # Bugs are not masked as an empty result
+    mock_make_api_request.side_effect = TypeError("unexpected argument")
+    
+    with pytest.raises(TypeError):
+        await get_markets()
+
+async def test_get_markets_uses_cache(mock_make_api_request, cache_enabled):
+    sample_markets = {"markets": [{"id": 123, "slug": "sample-market"}]}
+    mock_make_api_request.return_value = sample_markets
+    
+    # Identical calls within the TTL are served from the cache
+    first = await get_markets(limit=5)
+    second = await get_markets(limit=5)
+    
+    assert mock_make_api_request.call_args_list == [call("markets", params={"limit": 5})]
+    assert first == second == sample_markets
+    
+    # Different parameters are cached separately
+    await get_markets(limit=10)
+    assert mock_make_api_request.call_count == 2
+
+async def test_get_market_history_hourly_not_cached(mock_make_api_request, cache_enabled):
+    mock_make_api_request.return_value = {"history": []}
+    
+    # Hourly history always goes to the API
+    await get_market_history("123")
+    await get_market_history("123")
+    assert mock_make_api_request.call_count == 2
+    
+    # Daily history is cached
+    await get_market_history("123", resolution="day")
+    await get_market_history("123", resolution="day")
+    assert mock_make_api_request.call_count == 3
+
+async def test_get_markets_bulk(mock_make_api_request):
+    # Fail the lookup for one of the markets
+    async def fake_request(endpoint, params=None):
+        if endpoint == "markets/bad":
+            raise httpx.HTTPError("Not found")
+        return {"id": endpoint.split("/")[1]}
+    
+    mock_make_api_request.side_effect = fake_request
+    
+    # Call the function
+    result = await get_markets_bulk(["1", "bad", "2"])
+    
+    # Every market is requested and results keep the input order
+    assert mock_make_api_request.call_count == 3
+    assert result == [
+        {"id": "1"},
+        {"id": "bad", "error": "Not found"},
+        {"id": "2"},
+    ]
+
+async def test_market_details_resource(mock_make_api_request):
+    sample_market = {"id": 123, "slug": "sample-market", "active": True}
+    mock_make_api_request.return_value = sample_market
+    
+    # Call the resource handler
+    result = await market_details_resource("123")
+    
+    # The resource returns the market as indented JSON text
+    assert json.loads(result) == sample_market
+    assert result.startswith('{\n  "id": 123')
+
+async def test_market_details_resource_unserializable(mock_make_api_request):
+    # The tool reports API errors itself; the resource only handles encoding failures
+    mock_make_api_request.return_value = {"id": 123, "data": object()}
+    
+    result = await market_details_resource("123")
+    
+    assert result.startswith("Error retrieving market details: ")
+
+async def test_concurrent_identical_requests_are_shared(mock_make_api_request, cache_enabled):
+    sample_market = {"id": 123, "slug": "sample-market"}
+    mock_make_api_request.return_value = sample_market
+    
+    # Concurrent lookups of the same market share one API call
+    results = await asyncio.gather(get_market_by_id("123"), get_market_by_id("123"))
+    
+    assert mock_make_api_request.call_args_list == [call("markets/123", params=None)]
+    assert results == [sample_market, sample_market]
+
+async def test_cache_disabled_with_zero_ttl(mock_make_api_request):
+    mock_make_api_request.return_value = {"markets": []}
+    
+    # A cache TTL of 0 sends every call to the API
+    with patch('polymarket_mcp_server.server.config', GammaConfig(cache_ttl=0)):
+        await get_markets()
+        await get_markets()
+    
+    assert mock_make_api_request.call_count == 2
+
+async def test_get_markets_with_filters(mock_make_api_request):
+    mock_make_api_request.return_value = {"markets": []}
+    
+    # Call the function with list filters, empty strings and an orphan related_tags
+    await get_markets(
+        id=[1, 2],
+        slug="sample-market",
+        clob_token_ids="",
+        condition_ids=[],
+        order="",
+        end_date_min="",
+        liquidity_num_min=0.0,
+        closed=False,
+        related_tags=True,
+    )
+    
+    # Unset values are dropped, empty identifier filters are still sent,
+    # and related_tags requires tag_id
+    assert mock_make_api_request.call_args_list == [call("markets", params={
+        "id": [1, 2],
+        "slug": "sample-market",
+        "clob_token_ids": "",
+        "liquidity_num_min": 0.0,
+        "closed": False,
+    })]
+
+async def test_get_events_bulk(mock_make_api_request):
+    mock_make_api_request.side_effect = lambda endpoint, params=None: {"id": endpoint.split("/")[1]}
+    
+    # Call the function
+    result = await get_events_bulk(["456", "789"])
+    
+    # Each event is requested once and results keep the input order
+    assert mock_make_api_request.call_count == 2
+    assert result == [{"id": "456"}, {"id": "789"}]
+
+async def test_bulk_requests_are_bounded(mock_make_api_request):
+    in_flight = 0
+    max_in_flight = 0
+    
+    async def slow_request(endpoint, params=None):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return {"id": endpoint.split("/")[1]}
+    
+    mock_make_api_request.side_effect = slow_request
+    
+    # Fetch more markets than the concurrency bound allows at once
+    result = await get_markets_bulk([str(i) for i in range(50)])
+    
+    assert len(result) == 50
+    assert max_in_flight <= 20
+
+async def test_get_markets_legacy_status_mapping(mock_make_api_request):
+    mock_make_api_request.return_value = {"markets": []}
+    
+    # The legacy status wins over the matching boolean filter
+    await get_markets(status="Archived", archived=False)
+    assert mock_make_api_request.call_args_list == [call("markets", params={"archived": True})]
+    
+    # Unknown status values are ignored
+    mock_make_api_request.reset_mock()
+    await get_markets(status="pending")
+    assert mock_make_api_request.call_args_list == [call("markets", params={})]
+
+async def test_clear_response_cache(mock_make_api_request, cache_enabled):
+    sample_event = {"id": 456, "slug": "sample-event"}
+    mock_make_api_request.return_value = sample_event
+    
+    # The second lookup is served from the cache
+    await get_event_by_id("456")
+    await get_event_by_id("456")
+    assert mock_make_api_request.call_count == 1
+    
+    # Clearing the cache forces a fresh request
+    assert await clear_response_cache() == {"cleared": True}
+    await get_event_by_id("456")
+    assert mock_make_api_request.call_count == 2
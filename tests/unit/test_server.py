@@ -3,16 +3,22 @@
 Unit tests for the Polymarket MCP server.
 """
 
-import os
 import json
+import time
+import asyncio
 import pytest
 import httpx
-from unittest.mock import patch, AsyncMock, MagicMock
+from unittest.mock import patch, call, AsyncMock
 
+from polymarket_mcp_server import server as server_module
 from polymarket_mcp_server.server import (
     mcp,
-    config,
+    load_config,
     make_api_request,
+    _get_client,
+    close_client,
+    lifespan,
+    _RateLimiter,
     get_markets,
     get_market_by_id,
     search_markets,
@@ -22,260 +28,350 @@ from polymarket_mcp_server.server import (
 )
 
 
+def _response(status_code=200, content=b"{}", headers=None):
+    """Build a real httpx response for the mocked client to return."""
+    return httpx.Response(
+        status_code,
+        headers=headers,
+        content=content,
+        request=httpx.Request("GET", "https://gamma-api.polymarket.com/test"),
+    )
+
+
 @pytest.fixture
-def mock_make_api_request():
-    """Fixture to mock the make_api_request function."""
-    with patch('polymarket_mcp_server.server.make_api_request', new_callable=AsyncMock) as mock:
-        yield mock
+def mock_client():
+    """Fixture to replace the shared httpx client with a mock."""
+    client = AsyncMock()
+    with patch('polymarket_mcp_server.server._get_client', return_value=client):
+        yield client
 
 
-@pytest.mark.asyncio
-async def test_get_markets(mock_make_api_request):
-    """Test the get_markets function."""
-    # Set up mock response
-    mock_response = {"markets": [{"id": "123", "name": "Test Market"}]}
-    mock_make_api_request.return_value = mock_response
-    
-    # Execute the function
-    result = await get_markets()
+@pytest.fixture
+def stub_make_api_request(request, monkeypatch):
+    """Fixture to replace make_api_request with a stub returning the indirect response."""
+    calls = []
     
-    # Verify the call arguments
-    mock_make_api_request.assert_called_once_with("markets", params={})
+    async def stub(*args, **kwargs):
+        calls.append(call(*args, **kwargs))
+        return request.param
     
-    # Verify the result
-    assert result == [{"id": "123", "name": "Test Market"}]
+    monkeypatch.setattr(server_module, "make_api_request", stub)
+    return calls, request.param
 
 
-@pytest.mark.asyncio
-async def test_get_markets_with_status(mock_make_api_request):
-    """Test the get_markets function with status filter."""
-    # Set up mock response
-    mock_response = {"markets": [{"id": "123", "name": "Test Market", "status": "OPEN"}]}
-    mock_make_api_request.return_value = mock_response
+@pytest.mark.parametrize(
+    "tool, args, expected_call, stub_make_api_request",
+    [
+        (get_markets, {}, call("markets", params={}),
+         {"markets": [{"id": "123", "name": "Test Market"}]}),
+        (get_markets, {"status": "open"}, call("markets", params={"active": True}),
+         {"markets": [{"id": "123", "name": "Test Market", "active": True}]}),
+        (get_market_by_id, {"market_id": "market_123"}, call("markets/market_123", params=None),
+         {"id": "market_123", "name": "Test Market", "description": "Test Description"}),
+        (search_markets, {"query": "election"}, call("markets", params={"slug": "election", "limit": 20}),
+         {"markets": [{"id": "123", "name": "Election Market"}]}),
+        (get_order_book, {"market_id": "market_123"}, call("markets/market_123/orderbook", params=None),
+         {"bids": [], "asks": []}),
+        (get_order_book, {"market_id": "market_123", "outcome_id": "outcome_456"},
+         call("markets/market_123/orderbook", params={"outcome_id": "outcome_456"}),
+         {"bids": [{"price": "0.5", "size": "100"}], "asks": []}),
+        (get_recent_trades, {"market_id": "market_123"}, call("markets/market_123/trades", params={"limit": 50}),
+         {"trades": [{"price": "0.75", "size": "50", "timestamp": "2025-04-17T12:00:00Z"}]}),
+        (get_recent_trades, {"market_id": "market_123", "limit": 25}, call("markets/market_123/trades", params={"limit": 25}),
+         {"trades": [{"price": "0.75", "size": "50"}]}),
+        (get_market_history, {"market_id": "market_123"}, call("markets/market_123/history", params={"resolution": "hour"}),
+         {"history": [{"timestamp": "2025-04-17T00:00:00Z", "price": "0.65", "volume": "1000"}]}),
+        (get_market_history, {"market_id": "market_123", "resolution": "day"},
+         call("markets/market_123/history", params={"resolution": "day"}),
+         {"history": [{"timestamp": "2025-04-17", "price": "0.65", "volume": "5000"}]}),
+    ],
+    ids=[
+        "get_markets",
+        "get_markets_with_status",
+        "get_market_by_id",
+        "search_markets",
+        "get_order_book",
+        "get_order_book_with_outcome",
+        "get_recent_trades",
+        "get_recent_trades_with_limit",
+        "get_market_history",
+        "get_market_history_with_resolution",
+    ],
+    indirect=["stub_make_api_request"],
+)
+async def test_tool_requests(stub_make_api_request, tool, args, expected_call):
+    """Test that each tool requests the expected endpoint and returns the API response."""
+    calls, response = stub_make_api_request
     
     # Execute the function
-    result = await get_markets(status="OPEN")
+    result = await tool(**args)
     
     # Verify the call arguments
-    mock_make_api_request.assert_called_once_with("markets", params={"status": "OPEN"})
+    assert calls == [expected_call]
     
     # Verify the result
-    assert result == [{"id": "123", "name": "Test Market", "status": "OPEN"}]
+    assert result == response
 
 
-@pytest.mark.asyncio
-async def test_get_market_by_id(mock_make_api_request):
-    """Test the get_market_by_id function."""
-    # Set up test parameters
-    market_id = "market_123"
-    
-    # Set up mock response
-    mock_response = {"id": market_id, "name": "Test Market", "description": "Test Description"}
-    mock_make_api_request.return_value = mock_response
-    
-    # Execute the function
-    result = await get_market_by_id(market_id)
-    
-    # Verify the call arguments
-    mock_make_api_request.assert_called_once_with(f"markets/{market_id}")
-    
-    # Verify the result
-    assert result == mock_response
+async def test_make_api_request_get(mock_client):
+    """Test the make_api_request function with GET method."""
+    mock_client.request.return_value = _response(content=b'{"data": "test"}')
+    
+    # Call function
+    endpoint = "test"
+    params = {"param1": "value1"}
+    result = await make_api_request(endpoint, params=params)
+    
+    # Verify result
+    assert result == {"data": "test"}
+    
+    # Verify method calls
+    mock_client.request.assert_called_once()
+    args, kwargs = mock_client.request.call_args
+    assert args == ("GET", endpoint)
+    assert "params" in kwargs
+    assert kwargs["params"] == params
 
 
-@pytest.mark.asyncio
-async def test_search_markets(mock_make_api_request):
-    """Test the search_markets function."""
-    # Set up test parameters
-    query = "election"
-    
-    # Set up mock response
-    mock_response = {"markets": [{"id": "123", "name": "Election Market"}]}
-    mock_make_api_request.return_value = mock_response
-    
-    # Execute the function
-    result = await search_markets(query)
+async def test_make_api_request_error_handling(mock_client):
+    """Test that make_api_request handles errors correctly."""
+    mock_client.request.return_value = _response(404)
     
-    # Verify the call arguments
-    mock_make_api_request.assert_called_once_with("markets/search", params={"q": query, "limit": 20})
+    # Test that HTTPStatusError is raised
+    with pytest.raises(httpx.HTTPStatusError):
+        await make_api_request("test")
     
-    # Verify the result
-    assert result == [{"id": "123", "name": "Election Market"}]
+    # Verify method was called
+    mock_client.request.assert_called_once()
 
 
-@pytest.mark.asyncio
-async def test_get_order_book(mock_make_api_request):
-    """Test the get_order_book function."""
-    # Set up test parameters
-    market_id = "market_123"
+async def test_make_api_request_etag_revalidation(mock_client):
+    """Test that a 304 Not Modified response reuses the previously returned body."""
+    first_response = _response(headers={"ETag": '"v1"'}, content=b'{"data": "test"}')
+    not_modified = _response(304, headers={"ETag": '"v1"'}, content=b"")
+    mock_client.request.side_effect = [first_response, not_modified]
     
-    # Set up mock response
-    mock_response = {"bids": [], "asks": []}
-    mock_make_api_request.return_value = mock_response
-    
-    # Execute the function
-    result = await get_order_book(market_id)
+    first = await make_api_request("test")
+    second = await make_api_request("test")
     
-    # Verify the call arguments
-    mock_make_api_request.assert_called_once_with("orderbook", params={"marketId": market_id})
+    assert first == second == {"data": "test"}
     
-    # Verify the result
-    assert result == mock_response
+    # The second request carries the stored ETag
+    assert mock_client.request.call_args_list[0].kwargs["headers"] is None
+    assert mock_client.request.call_args_list[1].kwargs["headers"] == {"If-None-Match": '"v1"'}
 
+async def test_make_api_request_retries_transient_errors(mock_client):
+    """Test that rate limiting and gateway errors are retried with backoff."""
+    rate_limited = _response(429, headers={"Retry-After": "2"})
+    unavailable = _response(503)
+    success = _response(content=b'{"data": "test"}')
+    mock_client.request.side_effect = [rate_limited, unavailable, success]
+    
+    with patch('polymarket_mcp_server.server.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+        result = await make_api_request("test")
+    
+    assert result == {"data": "test"}
+    assert mock_client.request.call_count == 3
+    
+    # The first delay honors Retry-After, the second uses exponential backoff
+    delays = [c.args[0] for c in mock_sleep.call_args_list]
+    assert delays[0] == 2.0
+    assert 2.0 <= delays[1] < 3.0
 
-@pytest.mark.asyncio
-async def test_get_order_book_with_outcome(mock_make_api_request):
-    """Test the get_order_book function with outcome filter."""
-    # Set up test parameters
-    market_id = "market_123"
-    outcome_id = "outcome_456"
-    
-    # Set up mock response
-    mock_response = {"bids": [{"price": "0.5", "size": "100"}], "asks": []}
-    mock_make_api_request.return_value = mock_response
-    
-    # Execute the function
-    result = await get_order_book(market_id, outcome_id)
+
+async def test_make_api_request_gives_up_after_max_attempts(mock_client):
+    """Test that persistent gateway errors are raised after the last attempt."""
+    mock_client.request.return_value = _response(503)
     
-    # Verify the call arguments
-    mock_make_api_request.assert_called_once_with("orderbook", params={"marketId": market_id, "outcomeId": outcome_id})
+    with patch('polymarket_mcp_server.server.asyncio.sleep', new_callable=AsyncMock):
+        with pytest.raises(httpx.HTTPStatusError):
+            await make_api_request("test")
     
-    # Verify the result
-    assert result == mock_response
+    assert mock_client.request.call_count == 5
 
+async def test_make_api_request_retries_connection_errors(mock_client):
+    """Test that GETs are resent after dropped connections but not read timeouts."""
+    success = _response(content=b'{"data": "test"}')
+    mock_client.request.side_effect = [httpx.ReadError("connection reset"), success]
+    
+    with patch('polymarket_mcp_server.server.asyncio.sleep', new_callable=AsyncMock):
+        assert await make_api_request("test") == {"data": "test"}
+        assert mock_client.request.call_count == 2
+        
+        # A read timeout is raised straight away
+        mock_client.request.reset_mock()
+        mock_client.request.side_effect = httpx.ReadTimeout("timed out")
+        with pytest.raises(httpx.ReadTimeout):
+            await make_api_request("test")
+        assert mock_client.request.call_count == 1
 
-@pytest.mark.asyncio
-async def test_get_recent_trades(mock_make_api_request):
-    """Test the get_recent_trades function."""
-    # Set up test parameters
-    market_id = "market_123"
-    
-    # Set up mock response
-    mock_response = {"trades": [{"price": "0.75", "size": "50", "timestamp": "2025-04-17T12:00:00Z"}]}
-    mock_make_api_request.return_value = mock_response
-    
-    # Execute the function
-    result = await get_recent_trades(market_id)
-    
-    # Verify the call arguments
-    mock_make_api_request.assert_called_once_with("trades", params={"marketId": market_id, "limit": 50})
+async def test_make_api_request_connection_retry_budget(mock_client):
+    """Test that connect failures are left to the transport and dropped connections back off briefly."""
+    with patch('polymarket_mcp_server.server.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+        # The transport has already retried the connect, so it is raised after one attempt
+        mock_client.request.side_effect = httpx.ConnectError("connection refused")
+        with pytest.raises(httpx.ConnectError):
+            await make_api_request("test")
+        assert mock_client.request.call_count == 1
+        mock_sleep.assert_not_called()
+        
+        # A connection that keeps dropping is tried at most _MAX_ATTEMPTS times, with short waits
+        mock_client.request.reset_mock()
+        mock_client.request.side_effect = httpx.ReadError("connection reset")
+        with pytest.raises(httpx.ReadError):
+            await make_api_request("test")
+        assert mock_client.request.call_count == server_module._MAX_ATTEMPTS
     
-    # Verify the result
-    assert result == [{"price": "0.75", "size": "50", "timestamp": "2025-04-17T12:00:00Z"}]
-
+    delays = [c.args[0] for c in mock_sleep.call_args_list]
+    assert len(delays) == server_module._MAX_ATTEMPTS - 1
+    assert all(0.2 <= delay <= 2.0 for delay in delays)
+    assert sum(delays) <= 6.0
 
-@pytest.mark.asyncio
-async def test_get_recent_trades_with_limit(mock_make_api_request):
-    """Test the get_recent_trades function with custom limit."""
-    # Set up test parameters
-    market_id = "market_123"
-    limit = 25
+async def test_rate_limiter_spaces_out_requests():
+    """Test that the token bucket delays requests beyond its rate."""
+    limiter = _RateLimiter(20)
+    limiter._tokens = 1
     
-    # Set up mock response
-    mock_response = {"trades": [{"price": "0.75", "size": "50"}]}
-    mock_make_api_request.return_value = mock_response
+    start = time.monotonic()
+    await limiter.acquire()
+    await limiter.acquire()
     
-    # Execute the function
-    result = await get_recent_trades(market_id, limit)
+    # The second request has to wait for a token to refill (1/20s)
+    assert time.monotonic() - start >= 0.04
+
+async def test_rate_limiter_fractional_rate():
+    """Test that rates below one request per second still admit requests."""
+    limiter = _RateLimiter(0.5)
     
-    # Verify the call arguments
-    mock_make_api_request.assert_called_once_with("trades", params={"marketId": market_id, "limit": limit})
+    # The first request is admitted straight away
+    await asyncio.wait_for(limiter.acquire(), timeout=1)
     
-    # Verify the result
-    assert result == [{"price": "0.75", "size": "50"}]
+    # Two seconds later (1/0.5s) the bucket holds a whole token again
+    limiter._updated -= 2
+    await asyncio.wait_for(limiter.acquire(), timeout=1)
 
+async def test_make_api_request_bounds_in_flight_requests(mock_client):
+    """Test that concurrent requests never exceed the keep-alive pool size."""
+    in_flight = 0
+    max_in_flight = 0
+    
+    async def slow_request(method, endpoint, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return _response()
+    
+    mock_client.request.side_effect = slow_request
+    
+    # Send more requests than the module-level semaphore admits at once
+    limit = server_module._MAX_KEEPALIVE_CONNECTIONS
+    await asyncio.gather(*(make_api_request(f"test/{i}") for i in range(limit * 3)))
+    
+    assert mock_client.request.call_count == limit * 3
+    assert max_in_flight == limit
 
-@pytest.mark.asyncio
-async def test_get_market_history(mock_make_api_request):
-    """Test the get_market_history function."""
-    # Set up test parameters
-    market_id = "market_123"
+async def test_make_api_request_post(mock_client):
+    """Test the make_api_request function with POST method."""
+    mock_client.request.return_value = _response(content=b'{"ok": true}')
     
-    # Set up mock response
-    mock_response = {"history": [{"timestamp": "2025-04-17T00:00:00Z", "price": "0.65", "volume": "1000"}]}
-    mock_make_api_request.return_value = mock_response
+    result = await make_api_request("test", method="POST", data={"key": "value"})
     
-    # Execute the function
-    result = await get_market_history(market_id)
-    
-    # Verify the call arguments
-    mock_make_api_request.assert_called_once_with("markets/history", params={"marketId": market_id, "resolution": "hour"})
-    
-    # Verify the result
-    assert result == [{"timestamp": "2025-04-17T00:00:00Z", "price": "0.65", "volume": "1000"}]
+    assert result == {"ok": True}
+    args, kwargs = mock_client.request.call_args
+    assert args == ("POST", "test")
+    assert json.loads(kwargs["content"]) == {"key": "value"}
 
 
-@pytest.mark.asyncio
-async def test_get_market_history_with_resolution(mock_make_api_request):
-    """Test the get_market_history function with custom resolution."""
-    # Set up test parameters
-    market_id = "market_123"
-    resolution = "day"
+async def test_make_api_request_post_without_data(mock_client):
+    """Test that a POST without data sends no body."""
+    mock_client.request.return_value = _response(content=b'{"ok": true}')
     
-    # Set up mock response
-    mock_response = {"history": [{"timestamp": "2025-04-17", "price": "0.65", "volume": "5000"}]}
-    mock_make_api_request.return_value = mock_response
+    await make_api_request("test", method="POST")
     
-    # Execute the function
-    result = await get_market_history(market_id, resolution)
+    assert mock_client.request.call_args.kwargs["content"] is None
+
+
+async def test_make_api_request_post_not_retried(mock_client):
+    """Test that POST requests are not retried on gateway errors."""
+    mock_client.request.return_value = _response(503)
     
-    # Verify the call arguments
-    mock_make_api_request.assert_called_once_with("markets/history", params={"marketId": market_id, "resolution": resolution})
+    with pytest.raises(httpx.HTTPStatusError):
+        await make_api_request("test", method="POST", data={})
     
-    # Verify the result
-    assert result == [{"timestamp": "2025-04-17", "price": "0.65", "volume": "5000"}]
+    mock_client.request.assert_called_once()
 
 
-@pytest.mark.asyncio
-async def test_make_api_request_get():
-    """Test the make_api_request function with GET method."""
-    # Mock httpx.AsyncClient
-    mock_client = AsyncMock()
-    mock_response = MagicMock()
-    mock_response.json.return_value = {"data": "test"}
-    mock_client.get.return_value = mock_response
-    
-    # Patch httpx.AsyncClient
-    with patch('httpx.AsyncClient') as mock_async_client:
-        mock_async_client.return_value.__aenter__.return_value = mock_client
-        mock_async_client.return_value.__aexit__.return_value = None
-        
-        # Call function
-        endpoint = "test"
-        params = {"param1": "value1"}
-        result = await make_api_request(endpoint, params=params)
-        
-        # Verify result
-        assert result == {"data": "test"}
-        
-        # Verify method calls
-        url = f"{config.api_url.rstrip('/')}/{endpoint.lstrip('/')}"
-        mock_client.get.assert_called_once()
-        args, kwargs = mock_client.get.call_args
-        assert args[0] == url
-        assert "params" in kwargs
-        assert kwargs["params"] == params
+async def test_make_api_request_unsupported_method():
+    """Test that unsupported HTTP methods are rejected before any request is made."""
+    with patch('polymarket_mcp_server.server._get_client') as mock_get_client:
+        with pytest.raises(ValueError) as exc_info:
+            await make_api_request("test", method="DELETE")
+    
+    assert str(exc_info.value) == "Unsupported HTTP method: DELETE"
+    mock_get_client.assert_not_called()
 
 
-@pytest.mark.asyncio
-async def test_make_api_request_error_handling():
-    """Test that make_api_request handles errors correctly."""
-    # Mock httpx.AsyncClient
-    mock_client = AsyncMock()
-    mock_response = MagicMock()
-    mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-        "404 Not Found", request=MagicMock(), response=MagicMock()
-    )
-    mock_client.get.return_value = mock_response
-    
-    # Patch httpx.AsyncClient
-    with patch('httpx.AsyncClient') as mock_async_client:
-        mock_async_client.return_value.__aenter__.return_value = mock_client
-        mock_async_client.return_value.__aexit__.return_value = None
-        
-        # Test that HTTPStatusError is raised
-        with pytest.raises(httpx.HTTPStatusError):
-            await make_api_request("test")
-        
-        # Verify method was called
-        mock_client.get.assert_called_once()
+async def test_shared_client_is_reused():
+    """Test that the HTTP client is created once and reused until closed."""
+    client = _get_client()
+    try:
+        assert _get_client() is client
+    finally:
+        await close_client()
+    
+    # Endpoints are resolved against the configured API URL
+    assert str(client.base_url).rstrip("/") == server_module.config.api_url.rstrip("/")
+    
+    # Compressed responses are requested
+    assert "gzip" in client.headers["Accept-Encoding"]
+    assert "br" in client.headers["Accept-Encoding"]
+    assert client.headers["Accept"] == "application/json"
+    
+    # A new client is created after the shared one has been closed
+    assert client.is_closed
+    new_client = _get_client()
+    assert new_client is not client
+    await close_client()
+
+
+async def test_lifespan_creates_and_closes_client():
+    """Test that the server lifespan warms up the client and closes it on exit."""
+    async with lifespan(mcp):
+        client = server_module._client
+        assert client is not None
+        assert not client.is_closed
+    
+    assert client.is_closed
+
+
+def test_load_config_from_environment(monkeypatch):
+    """Test that load_config reads and parses all settings from the environment."""
+    monkeypatch.setenv("GAMMA_API_URL", "https://example.test/")
+    monkeypatch.setenv("GAMMA_REQUIRES_AUTH", "TRUE")
+    monkeypatch.setenv("GAMMA_CACHE_TTL", "0")
+    monkeypatch.setenv("GAMMA_RATE_LIMIT", "2.5")
+    monkeypatch.setenv("GAMMA_MAX_CONCURRENCY", "4")
+    
+    loaded = load_config()
+    
+    assert loaded.api_url == "https://example.test/"
+    assert loaded.requires_auth is True
+    assert loaded.cache_ttl == 0.0
+    assert loaded.rate_limit == 2.5
+    assert loaded.max_concurrency == 4
+
+def test_load_config_malformed_values(monkeypatch, caplog):
+    """Test that malformed or empty numeric settings fall back to their defaults with a warning."""
+    monkeypatch.setenv("GAMMA_CACHE_TTL", "5m")
+    monkeypatch.setenv("GAMMA_RATE_LIMIT", "fast")
+    monkeypatch.setenv("GAMMA_MAX_CONCURRENCY", "")
+    
+    loaded = load_config()
+    
+    assert loaded.cache_ttl == 300.0
+    assert loaded.rate_limit == 50.0
+    assert loaded.max_concurrency == 16
+    assert "Ignoring invalid GAMMA_CACHE_TTL='5m'" in caplog.text
+    assert "Ignoring invalid GAMMA_RATE_LIMIT='fast'" in caplog.text